@@ -71,6 +71,12 @@ class NotDivisibleError(Exception):
                                  "the given ratio")
 
 
+class InvalidRatioError(Exception):
+    def __init__(self):
+        Exception.__init__(self, "ratio numerator must not exceed the " +
+                                 "denominator")
+
+
 class TransactionGroupSizeError(Exception):
     def __init__(self):
         Exception.__init__(self, "transaction groups are limited to 16 " +
@@ -1,6 +1,9 @@
 import json
 import os
 
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.backends import default_backend
+
 from . import constants
 from . import error
 from . import encoding
@@ -139,6 +142,8 @@ def address(program):
     Returns:
         str: program address
     """
-    to_sign = constants.logic_prefix + program
-    checksum = encoding.checksum(to_sign)
-    return encoding.encode_address(checksum)
+    # hash the prefix and program without concatenating them
+    chksum = hashes.Hash(hashes.SHA512_256(), default_backend())
+    chksum.update(constants.logic_prefix)
+    chksum.update(program)
+    return encoding.encode_address(chksum.finalize())
@@ -1,14 +1,45 @@
 import math
-from . import error, encoding, transaction, logic
+from . import error, encoding, transaction, logic, constants
 import base64
 
 
+# template programs with placeholder values, decoded once at import
+_SPLIT_PROGRAM = base64.b64decode(
+    "ASAIAQUCAAYHCAkmAyDYHIR7TIW5eM/WAZcXdEDqv7BD+baMN6i2/A5JatG" +
+    "bNCDKsaoZHPQ3Zg8zZB/BZ1oDgt77LGo5np3rbto3/gloTyB40AS2H3I72Y" +
+    "CbDk4hKpm7J7NnFy2Xrt39TJG0ORFg+zEQIhIxASMMEDIEJBJAABkxCSgSM" +
+    "QcyAxIQMQglEhAxAiEEDRAiQAAuMwAAMwEAEjEJMgMSEDMABykSEDMBByoS" +
+    "EDMACCEFCzMBCCEGCxIQMwAIIQcPEBA=")
+_SPLIT_OFFSETS = (4, 7, 8, 9, 10, 14, 47, 80)
+_SPLIT_TYPES = (int, int, int, int, int, "address", "address", "address")
+
+_HTLC_PROGRAM = base64.b64decode(
+    "ASAEBQEABiYDIP68oLsUSlpOp7Q4pGgayA5soQW8tgf8VlMlyVaV9qITAQ" +
+    "Yg5pqWHm8tX3rIZgeSZVK+mCNe0zNjyoiRi7nJOKkVtvkxASIOMRAjEhAx" +
+    "BzIDEhAxCCQSEDEJKBItASkSEDEJKhIxAiUNEBEQ")
+_HTLC_OFFSETS = (3, 6, 10, 42, 45, 102)
+_HTLC_TYPES = (int, int, "address", "base64", "address", int)
+
+
 class Template:
+    _program = None
+    _address = None
+    # values derived from the contract fields, reset whenever a field changes
+    _cached = ("_program", "_address")
+
+    def __setattr__(self, name, value):
+        if not name.startswith("_"):
+            for attr in self._cached:
+                self.__dict__[attr] = None
+        super().__setattr__(name, value)
+
     def get_address(self):
         """
         Return the address of the contract.
         """
-        return logic.address(self.get_program())
+        if self._address is None:
+            self._address = logic.address(self.get_program())
+        return self._address
 
     def get_program(self):
         pass
@@ -25,10 +56,10 @@ class Split(Template):
     assets.
 
     Arguments:
-        owner (str): an address that can receive the asset after the expiry
-            round
-        receiver_1 (str): first address to receive assets
-        receiver_2 (str): second address to receive assets
+        owner (str|bytes): an address that can receive the asset after the
+            expiry round
+        receiver_1 (str|bytes): first address to receive assets
+        receiver_2 (str|bytes): second address to receive assets
         ratn (int): the numerator of the first address fraction
         ratd (int): the denominator of the first address fraction
         expiry_round (int): the round on which the assets can be transferred
@@ -37,7 +68,12 @@ class Split(Template):
             from the account to receiver_1
         max_fee (int): half the maximum fee that can be paid to the network by
             the account
+
+    Addresses may be given either base32 encoded or as 32 raw address bytes.
     """
+    _ratio = None
+    _cached = Template._cached + ("_ratio",)
+
     def __init__(self, owner: str, receiver_1: str, receiver_2: str, ratn: int,
                  ratd: int, expiry_round: int, min_pay: int, max_fee: int):
         self.owner = owner
@@ -53,17 +89,13 @@ class Split(Template):
         """
         Return a byte array to be used in LogicSig.
         """
-        orig = ("ASAIAQUCAAYHCAkmAyDYHIR7TIW5eM/WAZcXdEDqv7BD+baMN6i2/A5JatG" +
-                "bNCDKsaoZHPQ3Zg8zZB/BZ1oDgt77LGo5np3rbto3/gloTyB40AS2H3I72Y" +
-                "CbDk4hKpm7J7NnFy2Xrt39TJG0ORFg+zEQIhIxASMMEDIEJBJAABkxCSgSM" +
-                "QcyAxIQMQglEhAxAiEEDRAiQAAuMwAAMwEAEjEJMgMSEDMABykSEDMBByoS" +
-                "EDMACCEFCzMBCCEGCxIQMwAIIQcPEBA=")
-        orig = base64.b64decode(orig)
-        offsets = [4, 7, 8, 9, 10, 14, 47, 80]
+        if self._program is not None:
+            return self._program
         values = [self.max_fee, self.expiry_round, self.ratn, self.ratd,
                   self.min_pay, self.owner, self.receiver_1, self.receiver_2]
-        types = [int, int, int, int, int, "address", "address", "address"]
-        return inject(orig, offsets, values, types)
+        self._program = inject(_SPLIT_PROGRAM, _SPLIT_OFFSETS, values,
+                               _SPLIT_TYPES)
+        return self._program
 
     def get_send_funds_transaction(self, amount: int, first_valid, last_valid,
                                    gh, precise=True):
@@ -86,35 +118,40 @@ class Split(Template):
 
         Raises:
             NotDivisibleError: see precise
+            InvalidRatioError: if ratn is greater than ratd
         """
-        amt_1 = 0
-        amt_2 = 0
+        if self.ratn > self.ratd:
+            raise error.InvalidRatioError
 
-        gcd = math.gcd(self.ratn, self.ratd)
-        ratn = self.ratn // gcd
-        ratd = self.ratd // gcd
+        if self._ratio is None:
+            gcd = math.gcd(self.ratn, self.ratd)
+            self._ratio = (self.ratn // gcd, self.ratd // gcd)
+        ratn, ratd = self._ratio
 
-        if amount % ratd == 0:
+        if ratd == 1:
+            amt_1 = amount * ratn
+        elif amount % ratd == 0:
             amt_1 = amount // ratd * ratn
-            amt_2 = amount - amt_2
         elif precise:
             raise error.NotDivisibleError
         else:
             amt_1 = round(amount / ratd * ratn)
-            amt_2 = amount - amt_1
+        amt_2 = amount - amt_1
 
-        txn_1 = transaction.PaymentTxn(self.get_address(), self.max_fee,
-                                       first_valid, last_valid, gh,
-                                       self.receiver_1, amt_1)
-        txn_2 = transaction.PaymentTxn(self.get_address(), self.max_fee,
-                                       first_valid, last_valid, gh,
-                                       self.receiver_2, amt_2)
+        p = self.get_program()
+        addr = self.get_address()
 
-        transaction.assign_group_id([txn_1, txn_2])
+        receiver_1 = _encode_address(self.receiver_1)
+        receiver_2 = _encode_address(self.receiver_2)
 
-        p = self.get_program()
+        txn_1 = transaction.PaymentTxn(addr, self.max_fee, first_valid,
+                                       last_valid, gh, receiver_1, amt_1)
+        txn_2 = transaction.PaymentTxn(addr, self.max_fee, first_valid,
+                                       last_valid, gh, receiver_2, amt_2)
+
+        transaction.assign_group_id([txn_1, txn_2])
 
-        lsig = transaction.LogicSig(base64.b64decode(p))
+        lsig = transaction.LogicSig(p)
 
         stx_1 = transaction.LogicSigTransaction(txn_1, lsig)
         stx_2 = transaction.LogicSigTransaction(txn_2, lsig)
@@ -134,9 +171,9 @@ class HTLC(Template):
         2. To owner if txn.FirstValid > expiry_round
 
     Args:
-        owner (str): an address that can receive the asset after the expiry
-            round
-        receiver (str): address to receive Algos
+        owner (str|bytes): an address that can receive the asset after the
+            expiry round
+        receiver (str|bytes): address to receive Algos
         hash_function (str): the hash function to be used (must be either
             sha256 or keccak256)
         hash_image (str): the hash image in base64
@@ -145,6 +182,8 @@ class HTLC(Template):
         max_fee (int): the maximum fee that can be paid to the network by the
             account
 
+    Addresses may be given either base32 encoded or as 32 raw address bytes.
+
     """
     def __init__(self, owner: str, receiver: str, hash_function: str,
                  hash_image: str, expiry_round: int, max_fee: int):
@@ -159,69 +198,89 @@ class HTLC(Template):
         """
         Return a byte array to be used in LogicSig.
         """
-        orig = ("ASAEBQEABiYDIP68oLsUSlpOp7Q4pGgayA5soQW8tgf8VlMlyVaV9qITAQ" +
-                "Yg5pqWHm8tX3rIZgeSZVK+mCNe0zNjyoiRi7nJOKkVtvkxASIOMRAjEhAx" +
-                "BzIDEhAxCCQSEDEJKBItASkSEDEJKhIxAiUNEBEQ")
-        orig = base64.b64decode(orig)
+        if self._program is not None:
+            return self._program
         hash_inject = 0
         if self.hash_function == "sha256":
             hash_inject = 1
         elif self.hash_function == "keccak256":
             hash_inject = 2
-        offsets = [3, 6, 10, 42, 45, 102]
         values = [self.max_fee, self.expiry_round, self.receiver,
                   self.hash_image, self.owner, hash_inject]
-        types = [int, int, "address", "base64", "address", int]
-        return inject(orig, offsets, values, types)
+        self._program = inject(_HTLC_PROGRAM, _HTLC_OFFSETS, values,
+                               _HTLC_TYPES)
+        return self._program
 
 
-def put_uvarint(buf, x):
-    i = 0
-    while x >= 0x80:
-        buf.append((x & 0xFF) | 0x80)
-        x >>= 7
-        i += 1
+def _encode_address(addr):
+    # transactions expect base32 addresses
+    if isinstance(addr, bytes):
+        return encoding.encode_address(addr)
+    return addr
 
-    buf.append(x & 0xFF)
-    return i + 1
 
+def put_uvarint(x):
+    # the encoded length is known up front from the bit length
+    n = max(1, (x.bit_length() + 6) // 7)
+    buf = bytearray(n)
+    for i in range(n - 1):
+        buf[i] = (x >> (7 * i)) & 0x7F | 0x80
+    buf[n - 1] = x >> (7 * (n - 1))
+    return bytes(buf)
 
-def inject(orig, offsets, values, values_types):
-    # make sure we have enough values
-    assert len(offsets) == len(values) == len(values_types)
 
-    res = orig[:]
+# each handler returns the bytes to write and the length of the placeholder
+# they replace
+def _pack_int(val):
+    return put_uvarint(val), 1
 
-    def replace(arr, new_val, offset, place_holder_length):
-        return arr[:offset] + new_val + arr[offset+place_holder_length:]
 
-    for i in range(len(offsets)):
-        val = values[i]
-        val_type = values_types[i]
-        dec_len = 0
+def _pack_address(val):
+    if not isinstance(val, bytes):
+        val = encoding.decode_address(val)
+    elif len(val) != constants.key_len_bytes:
+        raise error.WrongKeyBytesLengthError
+    return val, 32
 
-        if val_type == int:
-            buf = []
-            dec_len = put_uvarint(buf, val) - 1
-            val = bytes(buf)
-            res = replace(res, val, offsets[i], 1)
 
-        elif val_type == "address":
-            val = encoding.decode_address(val)
-            res = replace(res, val, offsets[i], 32)
+def _pack_base64(val):
+    val = base64.b64decode(val)
+    return put_uvarint(len(val)) + val, 2
 
-        elif val_type == "base64":
-            val = bytes(base64.b64decode(val))
-            buf = []
-            dec_len = put_uvarint(buf, len(val)) + len(val) - 2
-            res = replace(res, bytes(buf) + val, offsets[i], 2)
 
-        else:
-            raise Exception("Unkown Type")
+_HANDLERS = {int: _pack_int, "address": _pack_address,
+             "base64": _pack_base64}
 
-        # update offsets
-        if dec_len != 0:
-            for o in range(len(offsets)):
-                offsets[o] += dec_len
 
-    return res
+def inject(orig, offsets, values, values_types):
+    # make sure we have enough values
+    assert len(offsets) == len(values) == len(values_types)
+
+    # offsets refer to the original program, so collect every replacement
+    # first and splice them all in a single pass
+    patches = []
+    for offset, val, val_type in zip(offsets, values, values_types):
+        pack = _HANDLERS.get(val_type)
+        if pack is None:
+            raise Exception("Unkown Type")
+        new_val, place_holder_length = pack(val)
+        patches.append((offset, place_holder_length, new_val))
+
+    patches.sort(key=lambda patch: patch[0])
+
+    size = len(orig) + sum(len(new_val) - place_holder_length
+                           for _, place_holder_length, new_val in patches)
+    res = bytearray(size)
+    src = memoryview(orig)
+    cursor = 0
+    pos = 0
+    for offset, place_holder_length, new_val in patches:
+        k = offset - cursor
+        res[pos:pos+k] = src[cursor:offset]
+        pos += k
+        res[pos:pos+len(new_val)] = new_val
+        pos += len(new_val)
+        cursor = offset + place_holder_length
+    res[pos:] = src[cursor:]
+
+    return bytes(res)
@@ -1001,6 +1001,12 @@ class TestLogic(unittest.TestCase):
         with self.assertRaises(error.InvalidProgram):
             logic.check_program(program, [])
 
+    def test_address(self):
+        program = b"\x01\x20\x01\x01\x22"  # int 1
+        to_sign = constants.logic_prefix + program
+        expected = encoding.encode_address(encoding.checksum(to_sign))
+        self.assertEqual(logic.address(program), expected)
+
 
 class TestLogicSig(unittest.TestCase):
     def test_basic(self):
@@ -1189,6 +1195,100 @@ class TestTemplate(unittest.TestCase):
         self.assertEqual(s.get_program(), base64.b64decode(golden))
         self.assertEqual(s.get_address(), golden_addr)
 
+    def test_program_cache(self):
+        addr1 = "WO3QIJ6T4DZHBX5PWJH26JLHFSRT7W7M2DJOULPXDTUS6TUX7ZRIO4KDFY"
+        addr2 = "W6UUUSEAOGLBHT7VFT4H2SDATKKSG6ZBUIJXTZMSLW36YS44FRP5NVAU7U"
+        addr3 = "XCIBIN7RT4ZXGBMVAMU3QS6L5EKB7XGROC5EPCNHHYXUIBAA5Q6C5Y7NEU"
+        s = template.Split(addr1, addr2, addr3, 30, 100, 123456,
+                           10000, 5000000)
+        p = s.get_program()
+        addr = s.get_address()
+        self.assertIs(s.get_program(), p)
+        self.assertIs(s.get_address(), addr)
+
+        # changing a field must produce a new program and address
+        s.min_pay = 20000
+        self.assertNotEqual(s.get_program(), p)
+        self.assertNotEqual(s.get_address(), addr)
+        s.min_pay = 10000
+        self.assertEqual(s.get_program(), p)
+        self.assertEqual(s.get_address(), addr)
+
+    def test_split_send_funds(self):
+        addr1 = "WO3QIJ6T4DZHBX5PWJH26JLHFSRT7W7M2DJOULPXDTUS6TUX7ZRIO4KDFY"
+        addr2 = "W6UUUSEAOGLBHT7VFT4H2SDATKKSG6ZBUIJXTZMSLW36YS44FRP5NVAU7U"
+        addr3 = "XCIBIN7RT4ZXGBMVAMU3QS6L5EKB7XGROC5EPCNHHYXUIBAA5Q6C5Y7NEU"
+        gh = "JgsgCaCTqIaLeVhyL6XlRu3n7Rfk2FxMeK+wRSaQ7dI="
+        s = template.Split(addr1, addr2, addr3, 30, 100, 123456,
+                           10000, 5000000)
+        stx_1, stx_2 = s.get_send_funds_transaction(1000, 1, 100, gh)
+
+        # both transactions are sent from the contract and share one lsig
+        self.assertIs(stx_1.lsig, stx_2.lsig)
+        self.assertEqual(stx_1.lsig.logic, s.get_program())
+        self.assertEqual(stx_1.transaction.sender, s.get_address())
+        self.assertEqual(stx_2.transaction.sender, s.get_address())
+        self.assertTrue(stx_1.lsig.verify(
+                        encoding.decode_address(s.get_address())))
+        self.assertEqual(stx_1.transaction.group, stx_2.transaction.group)
+        self.assertEqual(stx_1.transaction.receiver, addr2)
+        self.assertEqual(stx_2.transaction.receiver, addr3)
+
+    def test_split_raw_addresses(self):
+        addr1 = "WO3QIJ6T4DZHBX5PWJH26JLHFSRT7W7M2DJOULPXDTUS6TUX7ZRIO4KDFY"
+        addr2 = "W6UUUSEAOGLBHT7VFT4H2SDATKKSG6ZBUIJXTZMSLW36YS44FRP5NVAU7U"
+        addr3 = "XCIBIN7RT4ZXGBMVAMU3QS6L5EKB7XGROC5EPCNHHYXUIBAA5Q6C5Y7NEU"
+        gh = "JgsgCaCTqIaLeVhyL6XlRu3n7Rfk2FxMeK+wRSaQ7dI="
+        s = template.Split(addr1, addr2, addr3, 30, 100, 123456,
+                           10000, 5000000)
+        raw = template.Split(encoding.decode_address(addr1),
+                             encoding.decode_address(addr2),
+                             encoding.decode_address(addr3), 30, 100, 123456,
+                             10000, 5000000)
+        self.assertEqual(raw.get_program(), s.get_program())
+        self.assertEqual(raw.get_address(), s.get_address())
+
+        stx_1, stx_2 = raw.get_send_funds_transaction(1000, 1, 100, gh)
+        self.assertEqual(stx_1.transaction.receiver, addr2)
+        self.assertEqual(stx_2.transaction.receiver, addr3)
+        self.assertEqual(encoding.msgpack_encode(stx_1),
+                         encoding.msgpack_encode(
+                             s.get_send_funds_transaction(1000, 1, 100,
+                                                          gh)[0]))
+
+        raw.owner = encoding.decode_address(addr1)[:31]
+        self.assertRaises(error.WrongKeyBytesLengthError, raw.get_program)
+
+    def test_split_amounts(self):
+        addr1 = "WO3QIJ6T4DZHBX5PWJH26JLHFSRT7W7M2DJOULPXDTUS6TUX7ZRIO4KDFY"
+        addr2 = "W6UUUSEAOGLBHT7VFT4H2SDATKKSG6ZBUIJXTZMSLW36YS44FRP5NVAU7U"
+        addr3 = "XCIBIN7RT4ZXGBMVAMU3QS6L5EKB7XGROC5EPCNHHYXUIBAA5Q6C5Y7NEU"
+        gh = "JgsgCaCTqIaLeVhyL6XlRu3n7Rfk2FxMeK+wRSaQ7dI="
+        s = template.Split(addr1, addr2, addr3, 30, 100, 123456,
+                           10000, 5000000)
+        stx_1, stx_2 = s.get_send_funds_transaction(1000, 1, 100, gh)
+        self.assertEqual(stx_1.transaction.amt, 300)
+        self.assertEqual(stx_2.transaction.amt, 700)
+
+        self.assertRaises(error.NotDivisibleError,
+                          s.get_send_funds_transaction, 1001, 1, 100, gh)
+        stx_1, stx_2 = s.get_send_funds_transaction(1001, 1, 100, gh,
+                                                    precise=False)
+        self.assertEqual(stx_1.transaction.amt, 300)
+        self.assertEqual(stx_2.transaction.amt, 701)
+
+        s.ratn = 50
+        s.ratd = 50
+        stx_1, stx_2 = s.get_send_funds_transaction(1001, 1, 100, gh)
+        self.assertEqual(stx_1.transaction.amt, 1001)
+        self.assertEqual(stx_2.transaction.amt, 0)
+
+        # the first receiver can not get more than the whole amount
+        s.ratn = 3
+        s.ratd = 1
+        self.assertRaises(error.InvalidRatioError,
+                          s.get_send_funds_transaction, 1000, 1, 100, gh)
+
     def test_HTLC(self):
         addr1 = "726KBOYUJJNE5J5UHCSGQGWIBZWKCBN4WYD7YVSTEXEVNFPWUIJ7TAEOPM"
         addr2 = "42NJMHTPFVPXVSDGA6JGKUV6TARV5UZTMPFIREMLXHETRKIVW34QFSDFRE"
@@ -1206,6 +1306,13 @@ class TestTemplate(unittest.TestCase):
         self.assertEqual(p, base64.b64decode(golden))
         self.assertEqual(s.get_address(), golden_addr)
 
+    def test_put_uvarint(self):
+        self.assertEqual(template.put_uvarint(0), b"\x00")
+        self.assertEqual(template.put_uvarint(127), b"\x7f")
+        self.assertEqual(template.put_uvarint(128), b"\x80\x01")
+        self.assertEqual(template.put_uvarint(300), b"\xac\x02")
+        self.assertEqual(template.put_uvarint(5000000), b"\xc0\x96\xb1\x02")
+
 
 if __name__ == "__main__":
     to_run = [